@@ -1,15 +1,38 @@
 import os
 import logging
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import PlainTextResponse
 from prometheus_client import CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest
 from prometheus_fastapi_instrumentator import Instrumentator
 from .routes import router as api_router
+from .resources import Resources
+from .. import diagnostics
+from .debug_routes import router as debug_router
 
 logger = logging.getLogger("trade-svc")
 logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 
-app = FastAPI(title="trade-svc")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    resources = Resources()
+    app.state.resources = resources
+    monitor = None
+    try:
+        # inside the try so a half-finished startup still closes what it opened
+        await resources.startup()
+        if diagnostics.enabled():
+            monitor = diagnostics.LoopMonitor("api")
+            monitor.start()
+        yield
+    finally:
+        if monitor is not None:
+            await monitor.stop()
+        await resources.shutdown()
+
+
+app = FastAPI(title="trade-svc", lifespan=lifespan)
 
 # Prometheus metrics
 registry = CollectorRegistry()
@@ -21,4 +44,15 @@ async def healthz():
     return "ok"
 
 
+@app.get("/readyz", response_class=PlainTextResponse)
+async def readyz(request: Request):
+    # only true once the pool is warm and redis is connected
+    resources = getattr(request.app.state, "resources", None)
+    if resources is None or not resources.ready:
+        raise HTTPException(status_code=503, detail="not ready")
+    return "ok"
+
+
 app.include_router(api_router)
+if diagnostics.enabled():
+    app.include_router(debug_router)
@@ -0,0 +1,46 @@
+import os
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import Response
+from .. import diagnostics
+
+router = APIRouter(prefix="/debug/profile")
+
+
+def _authorize(token: Optional[str]) -> None:
+    expected = os.getenv("DIAGNOSTICS_TOKEN", "")
+    # without a configured token the endpoints stay closed
+    if not expected or not token or not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=403, detail="forbidden")
+
+
+async def _capture(kind: str, seconds: float) -> Response:
+    try:
+        data = await diagnostics.capture(kind, seconds)
+    except diagnostics.CaptureInProgress as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    filename = diagnostics.artifact_name(kind, "api")
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/cpu")
+async def cpu_profile(
+    seconds: float = Query(diagnostics.PROFILE_SECONDS, gt=0, le=diagnostics.MAX_PROFILE_SECONDS),
+    x_diagnostics_token: Optional[str] = Header(None),
+):
+    _authorize(x_diagnostics_token)
+    return await _capture("cpu", seconds)
+
+
+@router.get("/memory")
+async def memory_profile(
+    seconds: float = Query(diagnostics.PROFILE_SECONDS, gt=0, le=diagnostics.MAX_PROFILE_SECONDS),
+    x_diagnostics_token: Optional[str] = Header(None),
+):
+    _authorize(x_diagnostics_token)
+    return await _capture("memory", seconds)
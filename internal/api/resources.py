@@ -0,0 +1,46 @@
+import logging
+from typing import Optional
+from fastapi import Header, Request
+from ..storage.db import Database, schema_on_start
+from ..queue.publisher import OrderPublisher
+
+logger = logging.getLogger("trade-svc")
+
+
+class Resources:
+    """Clients shared by all requests, opened and closed by the app lifespan."""
+
+    def __init__(self) -> None:
+        self.db = Database()
+        self.publisher = OrderPublisher()
+        self.ready = False
+
+    async def startup(self) -> None:
+        # pool is prefilled and each connection warmed inside connect()
+        await self.db.connect()
+        if schema_on_start():
+            logger.info("DB_INIT_SCHEMA set; running bootstrap DDL")
+            await self.db.init_schema()
+        await self.publisher.connect()
+        self.ready = True
+
+    async def shutdown(self) -> None:
+        # uvicorn has already closed the listener and drained requests by now;
+        # draining from the Service is handled by the chart's preStop delay
+        await self.db.disconnect()
+        # close publisher redis client
+        await self.publisher.close()
+
+
+def get_db(request: Request) -> Database:
+    return request.app.state.resources.db
+
+
+def get_publisher(request: Request) -> OrderPublisher:
+    return request.app.state.resources.publisher
+
+
+def get_client_id(x_client_id: Optional[str] = Header(None)) -> Optional[str]:
+    # read-your-writes is opt-in: the peer address is shared by every caller
+    # behind an ingress, so only an explicit header identifies a client
+    return x_client_id or None
@@ -1,33 +1,23 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
 from ..domain.models import OrderCreate, OrderResponse, HealthResponse
 from ..storage.db import Database
 from ..queue.publisher import OrderPublisher
 from ..metrics import orders_created_total
+from .resources import get_client_id, get_db, get_publisher
 
 router = APIRouter()
 
-db = Database()
-publisher = OrderPublisher()
-
-
-@router.on_event("startup")
-async def on_startup():
-    await db.connect()
-    await db.init_schema()
-
-
-@router.on_event("shutdown")
-async def on_shutdown():
-    await db.disconnect()
-    # close publisher redis client
-    await publisher.close()
-
 
 @router.post("/orders", response_model=OrderResponse)
-async def create_order(payload: OrderCreate):
+async def create_order(
+    payload: OrderCreate,
+    db: Database = Depends(get_db),
+    publisher: OrderPublisher = Depends(get_publisher),
+    client_id: Optional[str] = Depends(get_client_id),
+):
     # Persist order as NEW
-    order = await db.create_order(payload)
+    order = await db.create_order(payload, client_id)
     # instrument metric
     orders_created_total.inc()
     # Enqueue for fill simulation
@@ -36,16 +26,20 @@ async def create_order(payload: OrderCreate):
 
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
-async def get_order(order_id: int):
-    order = await db.get_order(order_id)
+async def get_order(
+    order_id: int,
+    db: Database = Depends(get_db),
+    client_id: Optional[str] = Depends(get_client_id),
+):
+    order = await db.get_order(order_id, client_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     return order
 
 @router.get("/orders", response_model=List[OrderResponse])
-async def list_orders():
-    return await db.get_orders()
+async def list_orders(db: Database = Depends(get_db), client_id: Optional[str] = Depends(get_client_id)):
+    return await db.get_orders(client_id)
 
 @router.get("/positions")
-async def get_positions():
-    return await db.get_positions()
+async def get_positions(db: Database = Depends(get_db), client_id: Optional[str] = Depends(get_client_id)):
+    return await db.get_positions(client_id)
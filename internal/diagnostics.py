@@ -0,0 +1,187 @@
+"""Opt-in in-process diagnostics shared by the API and the worker.
+
+Nothing here runs unless DIAGNOSTICS_ENABLED is set: the loop monitor is never
+started and the profiler endpoints / signal handlers are never installed.
+"""
+import os
+import sys
+import signal
+import time
+import asyncio
+import cProfile
+import logging
+import tempfile
+import threading
+import traceback
+import tracemalloc
+from typing import List, Optional
+from .metrics import event_loop_lag_seconds, event_loop_blocked_total
+
+logger = logging.getLogger("diagnostics")
+
+LAG_INTERVAL = float(os.getenv("DIAGNOSTICS_LAG_INTERVAL_MS", "100")) / 1000
+BLOCK_THRESHOLD = float(os.getenv("DIAGNOSTICS_BLOCK_THRESHOLD_MS", "100")) / 1000
+# fine-grained so a stall is caught within ~10% of the threshold
+HEARTBEAT_INTERVAL = BLOCK_THRESHOLD / 10
+METRICS_PORT = int(os.getenv("DIAGNOSTICS_METRICS_PORT", "9101"))
+PROFILE_SECONDS = float(os.getenv("DIAGNOSTICS_PROFILE_SECONDS", "10"))
+MAX_PROFILE_SECONDS = float(os.getenv("DIAGNOSTICS_MAX_PROFILE_SECONDS", "60"))
+TRACEMALLOC_FRAMES = int(os.getenv("DIAGNOSTICS_TRACEMALLOC_FRAMES", "25"))
+OUTPUT_DIR = os.getenv("DIAGNOSTICS_DIR", tempfile.gettempdir())
+
+
+def enabled() -> bool:
+    return os.getenv("DIAGNOSTICS_ENABLED", "").lower() in ("1", "true", "yes")
+
+
+class CaptureInProgress(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+class LoopMonitor:
+    """Samples event-loop lag and reports stalls longer than BLOCK_THRESHOLD.
+
+    A coroutine sleeps for LAG_INTERVAL and records how late it woke up. A
+    second one bumps a heartbeat every HEARTBEAT_INTERVAL, and a watchdog
+    thread polling at the same rate dumps the loop thread's stack once the
+    heartbeat is BLOCK_THRESHOLD old, which names the blocking code.
+    """
+
+    def __init__(self, process: str) -> None:
+        self.process = process
+        self._tasks: List[asyncio.Task] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id = threading.get_ident()
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._tasks = [loop.create_task(self._sample()), loop.create_task(self._beat())]
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._thread is not None:
+            self._thread.join()
+
+    async def _sample(self) -> None:
+        lag = event_loop_lag_seconds.labels(process=self.process)
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(LAG_INTERVAL)
+            lag.observe(max(0.0, time.monotonic() - start - LAG_INTERVAL))
+
+    async def _beat(self) -> None:
+        while True:
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            beat = self._heartbeat
+            stalled = time.monotonic() - beat
+            if stalled < BLOCK_THRESHOLD or reported == beat:
+                continue
+            # report each stall once, from inside it, while the stack is live
+            reported = beat
+            event_loop_blocked_total.labels(process=self.process).inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>"
+            logger.warning(
+                "event loop blocked for >%.0fms in %s:\n%s",
+                stalled * 1000,
+                self.process,
+                stack,
+            )
+
+
+_capture_lock = asyncio.Lock()
+
+
+async def capture_cpu_profile(seconds: float) -> bytes:
+    """Profile the event-loop thread for `seconds`; returns a pstats dump."""
+    if _capture_lock.locked():
+        raise CaptureInProgress("a capture is already running")
+    async with _capture_lock:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+        return _dump(profiler.dump_stats)
+
+
+async def capture_allocations(seconds: float) -> bytes:
+    """Trace allocations for `seconds`; returns a tracemalloc snapshot dump."""
+    if _capture_lock.locked():
+        raise CaptureInProgress("a capture is already running")
+    async with _capture_lock:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        try:
+            await asyncio.sleep(seconds)
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            if started:
+                tracemalloc.stop()
+        return _dump(snapshot.dump)
+
+
+async def capture(kind: str, seconds: float) -> bytes:
+    """Run a "cpu" or "memory" capture for `seconds`."""
+    if kind == "cpu":
+        return await capture_cpu_profile(seconds)
+    return await capture_allocations(seconds)
+
+
+def _dump(write) -> bytes:
+    # both pstats and tracemalloc only know how to write to a path
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        write(path)
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.unlink(path)
+
+
+def artifact_name(kind: str, process: str) -> str:
+    ext = "prof" if kind == "cpu" else "tracemalloc"
+    return f"{process}-{kind}-{time.strftime('%Y%m%dT%H%M%S')}.{ext}"
+
+
+def install_signal_handlers(process: str) -> None:
+    """SIGUSR1 writes a CPU profile, SIGUSR2 an allocation snapshot, to OUTPUT_DIR."""
+    loop = asyncio.get_running_loop()
+    pending = set()
+
+    def trigger(kind: str) -> None:
+        task = loop.create_task(_capture_to_file(kind, process))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    loop.add_signal_handler(signal.SIGUSR1, trigger, "cpu")
+    loop.add_signal_handler(signal.SIGUSR2, trigger, "memory")
+
+
+async def _capture_to_file(kind: str, process: str) -> None:
+    try:
+        data = await capture(kind, PROFILE_SECONDS)
+    except CaptureInProgress:
+        logger.warning("ignoring %s capture request; another capture is running", kind)
+        return
+    path = os.path.join(OUTPUT_DIR, artifact_name(kind, process))
+    with open(path, "wb") as f:
+        f.write(data)
+    logger.info("wrote %s capture to %s", kind, path)
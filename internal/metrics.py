@@ -1,5 +1,26 @@
-from prometheus_client import Counter
+from prometheus_client import Counter, Histogram
 
 # Prometheus counters
 orders_created_total = Counter("orders_created_total", "Total orders created")
 orders_filled_total = Counter("orders_filled_total", "Total orders filled")
+
+# Event-loop diagnostics (only observed when DIAGNOSTICS_ENABLED is set)
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between scheduled and actual wake-up of the loop lag sampler",
+    ["process"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+event_loop_blocked_total = Counter(
+    "event_loop_blocked_total",
+    "Event loop stalls longer than DIAGNOSTICS_BLOCK_THRESHOLD_MS",
+    ["process"],
+)
+
+# Time spent waiting for a pooled DB connection, per pool (primary/replica)
+db_pool_acquire_seconds = Histogram(
+    "db_pool_acquire_seconds",
+    "Time waiting to acquire a connection from the DB pool",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
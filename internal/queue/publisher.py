@@ -11,6 +11,10 @@ class OrderPublisher:
     def __init__(self) -> None:
         self._redis = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
 
+    async def connect(self) -> None:
+        """Open the Redis connection up front instead of on the first publish."""
+        await self._redis.ping()
+
     async def publish_order(self, order: Order) -> None:
         payload = {
             "order_id": order.id,
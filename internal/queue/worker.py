@@ -5,9 +5,11 @@ import random
 import logging
 from datetime import datetime
 import redis.asyncio as redis
-from ..storage.db import Database
+from prometheus_client import start_http_server
+from ..storage.db import Database, FILL_STATEMENTS, schema_on_start
 from ..pricing.price_feed import RandomWalkPriceFeed
 from ..metrics import orders_filled_total
+from .. import diagnostics
 
 logger = logging.getLogger("worker")
 
@@ -27,9 +29,12 @@ async def process_message(db: Database, data: dict):
 
 async def worker():
     r = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
-    db = Database()
+    # the worker only writes, one message at a time: no replica and no
+    # prefilled pool
+    db = Database(use_replica=False, min_size=1, warm_statements=FILL_STATEMENTS)
     await db.connect()
-    await db.init_schema()
+    if schema_on_start():
+        await db.init_schema()
 
     # Create group if not exists
     try:
@@ -39,7 +44,15 @@ async def worker():
 
     price_feed = RandomWalkPriceFeed()
 
+    monitor = None
     try:
+        if diagnostics.enabled():
+            # the worker has no HTTP app; serve its registry for scraping
+            start_http_server(diagnostics.METRICS_PORT)
+            monitor = diagnostics.LoopMonitor("worker")
+            monitor.start()
+            diagnostics.install_signal_handlers("worker")
+
         while True:
             msgs = await r.xreadgroup(GROUP, CONSUMER, streams={STREAM_NAME: ">"}, count=10, block=5000)
             if not msgs:
@@ -84,6 +97,8 @@ async def worker():
         # allow Ctrl+C
         pass
     finally:
+        if monitor is not None:
+            await monitor.stop()
         try:
             # prefer async close API if available (redis>=5.0.1 uses aclose)
             close_fn = getattr(r, "aclose", None)
@@ -1,32 +1,151 @@
 import os
+import time
+import logging
 import asyncpg
-from typing import Optional, List
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional, List, Tuple
 from datetime import datetime
 from ..domain.models import Order, OrderCreate, OrderStatus, Fill, Position, Side
+from ..metrics import db_pool_acquire_seconds
+
+logger = logging.getLogger("storage")
+
+# Hot read statements, kept as constants so the warm-up below hits the exact
+# same text (and therefore the same asyncpg statement cache entry).
+GET_ORDER_SQL = "select id, symbol, side, qty, price, status, ts from orders where id=$1"
+FILL_ORDER_SQL = "select symbol, side, qty, price from orders where id=$1"
+GET_POSITION_SQL = "select qty, avg_price from positions where symbol=$1"
+
+# Statements to warm per role, with arguments that match no row (serial ids
+# start at 1): the API pools serve order lookups, the worker applies fills.
+READ_STATEMENTS = ((GET_ORDER_SQL, (0,)),)
+FILL_STATEMENTS = ((FILL_ORDER_SQL, (0,)), (GET_POSITION_SQL, ("",)))
+
+
+def schema_on_start() -> bool:
+    """Dev-only switch to run the bootstrap DDL at startup (Alembic is canonical)."""
+    return os.getenv("DB_INIT_SCHEMA", "").lower() in ("1", "true", "yes")
 
 
 class Database:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        use_replica: bool = True,
+        min_size: Optional[int] = None,
+        warm_statements: Tuple[Tuple[str, tuple], ...] = READ_STATEMENTS,
+    ) -> None:
         self._pool: Optional[asyncpg.Pool] = None
+        self._min_size = min_size
+        self._warm_statements = warm_statements
+        self._warm_skipped = False
+        self._replica: Optional[asyncpg.Pool] = None
+        self._use_replica = use_replica
+        # read-your-writes bookkeeping, oldest first: order id -> (client, ts)
+        # and client -> ts of its latest write
+        self._staleness = float(os.getenv("DB_REPLICA_STALENESS_SECONDS", "5"))
+        self._recent_orders: "OrderedDict[int, Tuple[str, float]]" = OrderedDict()
+        self._recent_clients: "OrderedDict[str, float]" = OrderedDict()
 
     async def connect(self):
+        max_size = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+        # min_size defaults to max_size so every connection is opened (and
+        # warmed) before the process reports ready; callers that don't serve
+        # concurrent traffic (the worker) pass a smaller one.
+        min_size = self._min_size
+        if min_size is None:
+            min_size = int(os.getenv("DB_POOL_MIN_SIZE", str(max_size)))
+        min_size = min(min_size, max_size)
         self._pool = await asyncpg.create_pool(
             user=os.getenv("DB_USER", "trade"),
             password=os.getenv("DB_PASSWORD", "trade"),
             database=os.getenv("DB_NAME", "trade"),
             host=os.getenv("DB_HOST", "localhost"),
             port=int(os.getenv("DB_PORT", "5432")),
-            min_size=1,
-            max_size=10,
+            min_size=min_size,
+            max_size=max_size,
+            init=self._warm_connection,
         )
+        replica_dsn = os.getenv("DB_REPLICA_DSN")
+        if self._use_replica and replica_dsn:
+            replica_max = int(os.getenv("DB_REPLICA_POOL_MAX_SIZE", str(max_size)))
+            replica_min = min(int(os.getenv("DB_REPLICA_POOL_MIN_SIZE", str(replica_max))), replica_max)
+            self._replica = await asyncpg.create_pool(
+                dsn=replica_dsn,
+                min_size=replica_min,
+                max_size=replica_max,
+                init=self._warm_connection,
+            )
+
+    async def _warm_connection(self, conn: asyncpg.Connection) -> None:
+        """Prepare this process's hot statements on a new connection.
+
+        The lookups match no rows, so this only populates the per-connection
+        statement cache.
+        """
+        try:
+            for sql, args in self._warm_statements:
+                await conn.fetchrow(sql, *args)
+        except asyncpg.UndefinedTableError:
+            # schema not created yet: expected once with DB_INIT_SCHEMA (DDL
+            # runs after connect), otherwise a missing migration
+            if not self._warm_skipped:
+                self._warm_skipped = True
+                logger.info("skipping statement warm-up; schema not present")
 
     async def disconnect(self):
+        if self._replica:
+            await self._replica.close()
         if self._pool:
             await self._pool.close()
 
+    @asynccontextmanager
+    async def _acquire(self, pool: asyncpg.Pool, name: str):
+        start = time.perf_counter()
+        async with pool.acquire() as conn:
+            db_pool_acquire_seconds.labels(pool=name).observe(time.perf_counter() - start)
+            yield conn
+
+    def _note_write(self, client_id: Optional[str], order_id: int) -> None:
+        if self._replica is None or client_id is None:
+            return
+        # expire here too so write-heavy processes don't accumulate entries
+        self._expire_writes()
+        now = time.monotonic()
+        self._recent_orders[order_id] = (client_id, now)
+        self._recent_clients.pop(client_id, None)
+        self._recent_clients[client_id] = now
+
+    def _expire_writes(self) -> None:
+        # both dicts are in write order, so expired entries are at the front
+        cutoff = time.monotonic() - self._staleness
+        while self._recent_orders and next(iter(self._recent_orders.values()))[1] < cutoff:
+            self._recent_orders.popitem(last=False)
+        while self._recent_clients and next(iter(self._recent_clients.values())) < cutoff:
+            self._recent_clients.popitem(last=False)
+
+    def _read_pool(self, client_id: Optional[str], order_id: Optional[int] = None) -> Tuple[asyncpg.Pool, str]:
+        """Pick the pool for a read.
+
+        Reads go to the replica unless the same client wrote within the
+        staleness window: a lookup of an order it created, or any listing.
+        """
+        assert self._pool is not None
+        if self._replica is None:
+            return self._pool, "primary"
+        if client_id is not None:
+            self._expire_writes()
+            if order_id is not None:
+                recent = self._recent_orders.get(order_id)
+                if recent is not None and recent[0] == client_id:
+                    return self._pool, "primary"
+            elif client_id in self._recent_clients:
+                return self._pool, "primary"
+        return self._replica, "replica"
+
     async def init_schema(self):
         assert self._pool is not None
-        async with self._pool.acquire() as conn:
+        async with self._acquire(self._pool, "primary") as conn:
             await conn.execute(
                 """
                 create table if not exists orders(
@@ -53,9 +172,9 @@ class Database:
                 """
             )
 
-    async def create_order(self, payload: OrderCreate) -> Order:
+    async def create_order(self, payload: OrderCreate, client_id: Optional[str] = None) -> Order:
         assert self._pool is not None
-        async with self._pool.acquire() as conn:
+        async with self._acquire(self._pool, "primary") as conn:
             row = await conn.fetchrow(
                 """
                 insert into orders(symbol, side, qty, price, status)
@@ -68,6 +187,7 @@ class Database:
                 float(payload.price),
                 OrderStatus.NEW.value,
             )
+            self._note_write(client_id, row["id"])
             return Order(
                 id=row["id"],
                 symbol=row["symbol"],
@@ -78,28 +198,29 @@ class Database:
                 ts=row["ts"],
             )
 
-    async def get_order(self, order_id: int) -> Optional[Order]:
-        assert self._pool is not None
-        async with self._pool.acquire() as conn:
-            row = await conn.fetchrow(
-                "select id, symbol, side, qty, price, status, ts from orders where id=$1",
-                order_id,
-            )
-            if not row:
-                return None
-            return Order(
-                id=row["id"],
-                symbol=row["symbol"],
-                side=Side(row["side"]),
-                qty=row["qty"],
-                price=row["price"],
-                status=OrderStatus(row["status"]),
-                ts=row["ts"],
-            )
+    async def get_order(self, order_id: int, client_id: Optional[str] = None) -> Optional[Order]:
+        pool, name = self._read_pool(client_id, order_id)
+        async with self._acquire(pool, name) as conn:
+            row = await conn.fetchrow(GET_ORDER_SQL, order_id)
+        if not row and name == "replica":
+            # may simply not have replicated yet (e.g. written via another pod)
+            async with self._acquire(self._pool, "primary") as conn:
+                row = await conn.fetchrow(GET_ORDER_SQL, order_id)
+        if not row:
+            return None
+        return Order(
+            id=row["id"],
+            symbol=row["symbol"],
+            side=Side(row["side"]),
+            qty=row["qty"],
+            price=row["price"],
+            status=OrderStatus(row["status"]),
+            ts=row["ts"],
+        )
 
-    async def get_orders(self) -> List[Order]:
-        assert self._pool is not None
-        async with self._pool.acquire() as conn:
+    async def get_orders(self, client_id: Optional[str] = None) -> List[Order]:
+        pool, name = self._read_pool(client_id)
+        async with self._acquire(pool, name) as conn:
             rows = await conn.fetch(
                 "select id, symbol, side, qty, price, status, ts from orders order by id"
             )
@@ -116,9 +237,9 @@ class Database:
                 for r in rows
             ]
 
-    async def get_positions(self):
-        assert self._pool is not None
-        async with self._pool.acquire() as conn:
+    async def get_positions(self, client_id: Optional[str] = None):
+        pool, name = self._read_pool(client_id)
+        async with self._acquire(pool, name) as conn:
             rows = await conn.fetch("select symbol, qty, avg_price from positions order by symbol")
             return [
                 {"symbol": r["symbol"], "qty": r["qty"], "avg_price": r["avg_price"]}
@@ -127,7 +248,7 @@ class Database:
 
     async def apply_fill(self, order_id: int, price: float, qty: float) -> None:
         assert self._pool is not None
-        async with self._pool.acquire() as conn:
+        async with self._acquire(self._pool, "primary") as conn:
             async with conn.transaction():
                 await conn.execute(
                     "insert into fills(order_id, price, qty) values($1,$2,$3)",
@@ -141,17 +262,11 @@ class Database:
                     OrderStatus.FILLED.value,
                 )
                 # upsert position
-                row = await conn.fetchrow(
-                    "select symbol, side, qty, price from orders where id=$1",
-                    order_id,
-                )
+                row = await conn.fetchrow(FILL_ORDER_SQL, order_id)
                 symbol = row["symbol"]
                 side = Side(row["side"])
                 signed_qty = qty if side == Side.BUY else -qty
-                existing = await conn.fetchrow(
-                    "select qty, avg_price from positions where symbol=$1",
-                    symbol,
-                )
+                existing = await conn.fetchrow(GET_POSITION_SQL, symbol)
                 if not existing:
                     await conn.execute(
                         "insert into positions(symbol, qty, avg_price) values($1,$2,$3)",
@@ -5,11 +5,11 @@ import requests
 BASE = os.getenv('BASE_URL', 'http://localhost:8000')
 
 
-def wait_for_health(timeout=30):
+def wait_for_health(timeout=30, path="/healthz"):
     end = time.time() + timeout
     while time.time() < end:
         try:
-            r = requests.get(f"{BASE}/healthz", timeout=1)
+            r = requests.get(f"{BASE}{path}", timeout=1)
             if r.status_code == 200:
                 return True
         except Exception:
@@ -36,6 +36,10 @@ def test_health():
     assert wait_for_health()
 
 
+def test_ready():
+    assert wait_for_health(path="/readyz")
+
+
 # TO DO: Need to validate create fill order
 # def test_create_order_and_fill():
 #     payload = {"symbol": "FOO", "side": "BUY", "qty": 1, "price": 100}
@@ -0,0 +1,71 @@
+import pytest
+from internal.storage import db as db_module
+from internal.storage.db import Database
+
+PRIMARY = object()
+REPLICA = object()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(db_module.time, "monotonic", c)
+    return c
+
+
+def make_db(replica=True, staleness=5.0):
+    db = Database()
+    db._pool = PRIMARY
+    db._replica = REPLICA if replica else None
+    db._staleness = staleness
+    return db
+
+
+def test_primary_only_without_replica(clock):
+    db = make_db(replica=False)
+    db._note_write("alice", 1)
+    assert db._read_pool("alice", 1) == (PRIMARY, "primary")
+    assert db._read_pool(None) == (PRIMARY, "primary")
+    assert not db._recent_orders
+
+
+def test_same_client_reads_own_order_from_primary(clock):
+    db = make_db()
+    db._note_write("alice", 1)
+    assert db._read_pool("alice", 1) == (PRIMARY, "primary")
+    assert db._read_pool("alice") == (PRIMARY, "primary")
+
+
+def test_other_client_reads_from_replica(clock):
+    db = make_db()
+    db._note_write("alice", 1)
+    assert db._read_pool("bob", 1) == (REPLICA, "replica")
+    assert db._read_pool("bob") == (REPLICA, "replica")
+    assert db._read_pool(None, 1) == (REPLICA, "replica")
+
+
+def test_back_to_replica_after_window(clock):
+    db = make_db()
+    db._note_write("alice", 1)
+    clock.now += 5.1
+    assert db._read_pool("alice", 1) == (REPLICA, "replica")
+    assert db._read_pool("alice") == (REPLICA, "replica")
+
+
+def test_entries_expire_under_write_only_traffic(clock):
+    db = make_db(staleness=1.0)
+    for order_id in range(100):
+        db._note_write(f"client-{order_id % 7}", order_id)
+        clock.now += 0.1
+    # only writes from the last second are retained
+    assert len(db._recent_orders) <= 11
+    assert len(db._recent_clients) <= 7
+    assert min(db._recent_orders) >= 89
@@ -0,0 +1,112 @@
+import asyncio
+import pstats
+import time
+import tracemalloc
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from internal import diagnostics
+from internal.api.debug_routes import router as debug_router
+
+AUTH = {"X-Diagnostics-Token": "s3cret"}
+
+
+def blocked_count(process):
+    return REGISTRY.get_sample_value("event_loop_blocked_total", {"process": process}) or 0.0
+
+
+def test_loop_monitor_flags_block_just_over_threshold():
+    async def run():
+        monitor = diagnostics.LoopMonitor("test-block")
+        monitor.start()
+        await asyncio.sleep(diagnostics.BLOCK_THRESHOLD)
+        before = blocked_count("test-block")
+        time.sleep(diagnostics.BLOCK_THRESHOLD * 1.5)
+        await asyncio.sleep(diagnostics.HEARTBEAT_INTERVAL)
+        after = blocked_count("test-block")
+        await monitor.stop()
+        return before, after
+
+    before, after = asyncio.run(run())
+    assert after == before + 1
+
+
+def test_loop_monitor_ignores_idle_loop():
+    async def run():
+        monitor = diagnostics.LoopMonitor("test-idle")
+        monitor.start()
+        await asyncio.sleep(diagnostics.BLOCK_THRESHOLD * 3)
+        await monitor.stop()
+
+    asyncio.run(run())
+    assert blocked_count("test-idle") == 0
+
+
+def make_client(monkeypatch, token="s3cret"):
+    if token is None:
+        monkeypatch.delenv("DIAGNOSTICS_TOKEN", raising=False)
+    else:
+        monkeypatch.setenv("DIAGNOSTICS_TOKEN", token)
+    app = FastAPI()
+    app.include_router(debug_router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Diagnostics-Token": "wrong"}])
+def test_profile_requires_token(monkeypatch, headers):
+    client = make_client(monkeypatch)
+    assert client.get("/debug/profile/cpu?seconds=0.01", headers=headers).status_code == 403
+
+
+def test_profile_closed_without_configured_token(monkeypatch):
+    client = make_client(monkeypatch, token=None)
+    r = client.get("/debug/profile/cpu?seconds=0.01", headers={"X-Diagnostics-Token": ""})
+    assert r.status_code == 403
+
+
+def test_profile_rejects_seconds_over_max(monkeypatch):
+    client = make_client(monkeypatch)
+    r = client.get(
+        f"/debug/profile/memory?seconds={diagnostics.MAX_PROFILE_SECONDS + 1}",
+        headers=AUTH,
+    )
+    assert r.status_code == 422
+
+
+def test_profile_conflicts_with_running_capture(monkeypatch):
+    monkeypatch.setenv("DIAGNOSTICS_TOKEN", "s3cret")
+    app = FastAPI()
+    app.include_router(debug_router)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/debug/profile/memory?seconds=0.3", headers=AUTH))
+            await asyncio.sleep(0.1)
+            second = await client.get("/debug/profile/cpu?seconds=0.01", headers=AUTH)
+            return (await first).status_code, second.status_code
+
+    assert asyncio.run(run()) == (200, 409)
+
+
+def test_cpu_profile_loads_with_pstats(monkeypatch, tmp_path):
+    client = make_client(monkeypatch)
+    r = client.get("/debug/profile/cpu?seconds=0.05", headers=AUTH)
+    assert r.status_code == 200
+    assert r.headers["content-disposition"].endswith('.prof"')
+    path = tmp_path / "api.prof"
+    path.write_bytes(r.content)
+    pstats.Stats(str(path))
+
+
+def test_memory_profile_loads_with_tracemalloc(monkeypatch, tmp_path):
+    client = make_client(monkeypatch)
+    r = client.get("/debug/profile/memory?seconds=0.05", headers=AUTH)
+    assert r.status_code == 200
+    path = tmp_path / "api.tracemalloc"
+    path.write_bytes(r.content)
+    tracemalloc.Snapshot.load(str(path))
+    # tracing is only kept on for the capture
+    assert not tracemalloc.is_tracing()
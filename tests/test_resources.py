@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from internal.api.app import app
+from internal.api.resources import Resources
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.calls = []
+
+    async def connect(self):
+        self.calls.append("connect")
+
+    async def init_schema(self):
+        self.calls.append("init_schema")
+
+    async def disconnect(self):
+        self.calls.append("disconnect")
+
+
+class FakePublisher:
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+def started_resources():
+    resources = Resources()
+    resources.db = FakeDatabase()
+    resources.publisher = FakePublisher()
+    asyncio.run(resources.startup())
+    return resources
+
+
+def test_startup_skips_ddl_by_default(monkeypatch):
+    monkeypatch.delenv("DB_INIT_SCHEMA", raising=False)
+    resources = started_resources()
+    assert resources.db.calls == ["connect"]
+    assert resources.ready
+
+
+def test_startup_runs_ddl_when_flag_set(monkeypatch):
+    monkeypatch.setenv("DB_INIT_SCHEMA", "1")
+    resources = started_resources()
+    assert resources.db.calls == ["connect", "init_schema"]
+
+
+@pytest.fixture
+def client():
+    # no `with`: the lifespan (and real connections) never run
+    yield TestClient(app)
+    if hasattr(app.state, "resources"):
+        del app.state.resources
+
+
+def test_readyz_without_resources(client):
+    assert client.get("/readyz").status_code == 503
+
+
+def test_readyz_not_ready(client):
+    resources = Resources()
+    app.state.resources = resources
+    assert client.get("/readyz").status_code == 503
+    resources.ready = True
+    assert client.get("/readyz").status_code == 200